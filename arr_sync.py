@@ -1,6 +1,7 @@
 from utilities.gsheet_api import GSheetConnector
 from utilities.hubspot_api import HubSpotConnector
 from datetime import datetime
+from typing import Optional
 import logging
 
 # Logging setup 
@@ -18,16 +19,18 @@ columns_to_clear = "A2:AG"
 sheet_name_clear = "LineItem Import"
 first_col = "A"
 last_col = "AG"
-BATCH_SIZE = 200
 
 # HubSpot setup
 stage_ids = ["1018520978", "8913715", "50301000", "28032678"]
 
-def main():
+def main(hubspot: Optional[HubSpotConnector] = None):
     # Initialize connectors
-    hubspot = HubSpotConnector()
+    hubspot = hubspot or HubSpotConnector()
     gsheet = GSheetConnector()
 
+    # One sync timestamp shared by every row (Column AG)
+    now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
     
 
     # Search for active deals in HubSpot
@@ -38,52 +41,71 @@ def main():
 
     logger.info(f"Found {len(active_deals.get('results', []))} active deals.")
 
-    # Start row index for GSheet updates and collect batch payload
-    row_index = 2
-    sheet_updates = []
+    deals = active_deals.get("results", [])
+
+    # Get line item IDs for all deals in batches
+    associations = hubspot.batch_get_associations("deals", (deal.get("id") for deal in deals), "line_items")
+    if associations is None:
+        logger.error("Job aborted due to association retrieval failure.")
+        return
+
+    # Get line item properties for all deals in batches
+    line_items = hubspot.batch_read_line_items(li_id for ids in associations.values() for li_id in ids)
+    if line_items is None:
+        logger.error("Job aborted due to line item batch retrieval failure.")
+        return
+
+    # Collect sheet rows; they are written as one contiguous range starting at row 2
+    all_rows = []
 
     # Iterate through deals one at a time
-    for deal in active_deals.get("results", []):
+    for deal in deals:
         deal_id = deal.get("id")
         deal_props = deal.get("properties", {})
 
-        # Get line items for this deal
-        assoc_data = hubspot.get_associations("deals", deal_id, "line_items")
-        if assoc_data is None:
-            logger.error("Job aborted due to association retrieval failure for deal %s.", deal_id)
-            return
-
-        assoc_results = assoc_data.get("results")
-        if assoc_results is None:
-            logger.error("Job aborted due to malformed association payload for deal %s.", deal_id)
-            return
-
-        if not assoc_results:
+        deal_li_ids = associations.get(str(deal_id), [])
+        if not deal_li_ids:
             logger.warning("No line items associated with deal %s; continuing to next deal.", deal_id)
             continue
 
+        # Deal columns are the same for every line item of this deal
+        deal_cols = (
+            deal_props.get("company_name", ""),                       # Column A
+            deal_props.get("dealname", ""),                           # Column B
+            deal_props.get("icp_sync", ""),                           # Column D
+            deal_props.get("date_entered_upcoming_churn_sync", ""),   # Column E
+            deal_props.get("cs_active_sync", ""),                     # Column F
+            deal_props.get("client_cancellation_period_deals", ""),   # Column O
+            deal_props.get("hs_object_id", ""),                       # Column P
+            deal_props.get("dealtype", ""),                           # Column Q
+            deal_props.get("contract_start_date", ""),                # Column R
+            deal_props.get("contract_end_date", ""),                  # Column S
+            deal_props.get("contract_length", ""),                    # Column T
+            deal_props.get("contract_renewal_date_deals", ""),        # Column U
+            deal_props.get("hs_is_closed_won", ""),                   # Column V
+            deal_props.get("hs_is_closed", ""),                       # Column W
+            deal_props.get("deal_currency_code", ""),                 # Column X
+            deal_props.get("closedate", ""),                          # Column Y
+            deal_props.get("dealstage", ""),                          # Column Z
+            deal_props.get("pipeline", ""),                           # Column AA
+            deal_props.get("lifecycle_stage", ""),                    # Column AB
+            deal_props.get("hs_v2_date_entered_28032678", ""),        # Column AC
+            deal_props.get("admin___ready_for_deletions___2506", ""), # Column AD
+            deal_props.get("company_id", ""),                         # Column AE
+        )
+
         # Process each line item for this deal
-        for assoc in assoc_results:
-            line_item_id = assoc.get("id")
-            if not line_item_id:
-                continue
-
-            # Get line item properties
-            line_item_data = hubspot.get_line_item_by_id(line_item_id,)
-            if not line_item_data or "properties" not in line_item_data:
+        for line_item_id in deal_li_ids:
+            li_props = line_items.get(str(line_item_id))
+            if li_props is None:
                 logger.error(f"Job aborted due to line item retrieval failure for line item ID: {line_item_id}")
                 return
 
-            li_props = line_item_data.get("properties", {})
-
             # Prepare row values
             row_values = [
-                deal_props.get("company_name", ""),                       # Column A
-                deal_props.get("dealname", ""),                           # Column B
+                *deal_cols[:2],                                           # Columns A-B
                 li_props.get("name", ""),                                 # Column C
-                deal_props.get("icp_sync", ""),                           # Column D
-                deal_props.get("date_entered_upcoming_churn_sync", ""),   # Column E
-                deal_props.get("cs_active_sync", ""),                     # Column F
+                *deal_cols[2:5],                                          # Columns D-F
                 li_props.get("quantity", ""),                             # Column G
                 li_props.get("discount", ""),                             # Column H
                 li_props.get("recurringbillingfrequency", ""),            # Column I
@@ -92,53 +114,28 @@ def main():
                 li_props.get("hs_billing_start_delay_type", ""),          # Column L
                 li_props.get("hs_recurring_billing_start_date", ""),      # Column M
                 li_props.get("hs_post_tax_amount", ""),                   # Column N
-                deal_props.get("client_cancellation_period_deals", ""),   # Column O
-                deal_props.get("hs_object_id", ""),                       # Column P
-                deal_props.get("dealtype", ""),                           # Column Q
-                deal_props.get("contract_start_date", ""),                # Column R
-                deal_props.get("contract_end_date", ""),                  # Column S
-                deal_props.get("contract_length", ""),                    # Column T
-                deal_props.get("contract_renewal_date_deals", ""),        # Column U
-                deal_props.get("hs_is_closed_won", ""),                   # Column V
-                deal_props.get("hs_is_closed", ""),                       # Column W
-                deal_props.get("deal_currency_code", ""),                 # Column X
-                deal_props.get("closedate", ""),                          # Column Y
-                deal_props.get("dealstage", ""),                          # Column Z
-                deal_props.get("pipeline", ""),                           # Column AA
-                deal_props.get("lifecycle_stage", ""),                    # Column AB
-                deal_props.get("hs_v2_date_entered_28032678", ""),        # Column AC
-                deal_props.get("admin___ready_for_deletions___2506", ""), # Column AD
-                deal_props.get("company_id", ""),                         # Column AE
+                *deal_cols[5:],                                           # Columns O-AE
                 li_props.get("hs_object_id", ""),                         # Column AF
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S")              # Column AG
+                now_str,                                                  # Column AG
             ]
 
-            range_to_update = f"{sheet_name_clear}!{first_col}{row_index}:{last_col}{row_index}"
-            sheet_updates.append(
-                {
-                    "range": range_to_update,
-                    "values": [row_values],
-                }
-            )
-            row_index += 1
+            all_rows.append(row_values)
 
-    if sheet_updates:
+    if all_rows:
         # Clear line item import sheet
         gsheet.clear_selected_columns(spreadsheet_id, sheet_name_clear, columns_to_clear)
-        total_rows = len(sheet_updates)
+        total_rows = len(all_rows)
         logger.info("Prepared %d rows for Google Sheets update.", total_rows)
 
-        for start in range(0, total_rows, BATCH_SIZE):
-            chunk = sheet_updates[start : start + BATCH_SIZE]
-            if not gsheet.batch_update_values(spreadsheet_id, chunk):
-                first_row = start + 2  # Sheet starts at row 2
-                last_row = first_row + len(chunk) - 1
-                logger.error(
-                    "Stopping sync after failing to update rows %d-%d in Google Sheets.",
-                    first_row,
-                    last_row,
-                )
-                return
+        # Written through the values API rather than a Drive CSV file replace: the import
+        # sheet shares its spreadsheet with "ARR HS Export", which a replace would wipe,
+        # and RAW input keeps HubSpot values as-is instead of re-parsing them like a CSV paste.
+        range_to_update = f"{sheet_name_clear}!{first_col}2:{last_col}{total_rows + 1}"
+        if not gsheet.batch_update_values(
+            spreadsheet_id, [{"range": range_to_update, "values": all_rows}]
+        ):
+            logger.error("Stopping sync after failing to update rows 2-%d in Google Sheets.", total_rows + 1)
+            return
 
         logger.info("Successfully wrote %d rows to Google Sheets.", total_rows)
     else:
@@ -151,7 +148,8 @@ def main():
         logger.warning("No company ARR data found in GSheet.")
         return
 
-    updated_count = 0
+    # Collect one update per company (a later row wins), then send them in batches
+    company_updates = {}
     for row in value_ranges[0].get("values", [])[1:]:
         if len(row) < 4:
             continue
@@ -160,23 +158,28 @@ def main():
             logger.warning("Skipping HubSpot update due to missing company ID.")
             continue
 
-        properties = {
+        company_updates[str(company_id)] = {
             "current_booked_arr": arr_booked,
             "current_nrr__mom_": nrr,
             "total_current_nrr__mom____weighted": weighted_nrr,
         }
-        result = hubspot.update_company_properties(str(company_id), properties)
-        if result:
-            updated_count += 1
-        else:
-            logger.error("Aborting company updates due to failure updating company ID %s.", company_id)
-            return
 
-    if updated_count:
-        logger.info("Updated %d companies in HubSpot.", updated_count)
-    else:
-        logger.info("No HubSpot company updates to apply.") 
+    if not company_updates:
+        logger.info("No HubSpot company updates to apply.")
+        return
 
+    updated = hubspot.batch_update_companies(
+        [{"id": company_id, "properties": properties} for company_id, properties in company_updates.items()]
+    )
+    if len(updated) < len(company_updates):
+        logger.error(
+            "Updated only %d of %d companies in HubSpot.",
+            len(updated),
+            len(company_updates),
+        )
+    else:
+        logger.info("Updated %d companies in HubSpot.", len(updated))
 
 if __name__ == "__main__":
-    main()
+    with HubSpotConnector() as hubspot:
+        main(hubspot)
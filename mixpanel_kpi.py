@@ -1,6 +1,12 @@
+import logging
+import sqlite3
+from collections import Counter, defaultdict
+from contextlib import closing
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Set, Union
+from pathlib import Path
+from typing import Any, DefaultDict, Dict, Optional, Set, Tuple, Union
 
+import msgspec
 from dotenv import load_dotenv
 
 from utilities.hubspot_api import HubSpotConnector
@@ -9,6 +15,8 @@ from utilities.mixpanel_api import MixpanelConnector
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 hubcon = HubSpotConnector()
 mixpanel = MixpanelConnector()
 
@@ -18,6 +26,10 @@ DELTA=90 # DELTA days ago
 START_DATE = (datetime.now() - timedelta(days=DELTA)).strftime("%Y-%m-%d")
 END_DATE = datetime.now().strftime("%Y-%m-%d")
 
+# organisation_id -> hubSpot company id lookups persisted across runs
+HUBSPOT_ID_CACHE_FILE = Path(__file__).resolve().parent / "hubspot_id_cache.sqlite"
+HUBSPOT_ID_CACHE_TTL_DAYS = 30
+
 
 MIXPANEL_EVENT_TO_HUBSPOT_PROPERTY: Dict[str, Union[str, Dict[str, str]]] = {
     # mixpanel event name -> hubSpot property name (extend as needed)
@@ -31,84 +43,155 @@ MIXPANEL_EVENT_TO_HUBSPOT_PROPERTY: Dict[str, Union[str, Dict[str, str]]] = {
         "dashboard": "dashboard_views_past_90_days",
     },
 }
-def main() -> None:
+
+# (keyword, hubSpot property) pairs per url-keyword mapped event, matched once per event as it streams in
+URL_KEYWORDS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    event: tuple(mapping.items())
+    for event, mapping in MIXPANEL_EVENT_TO_HUBSPOT_PROPERTY.items()
+    if not isinstance(mapping, str)
+}
+class MixpanelEventProperties(msgspec.Struct):
+    """
+    Event properties read by this sync; all other properties are skipped while decoding.
+
+    Fields are typed Any so an unexpected value type (e.g. a numeric $insert_id)
+    is normalised in main() instead of failing validation and dropping the event.
+    """
+
+    insert_id: Any = msgspec.field(default=None, name="$insert_id")
+    organization_id: Any = None
+    url: Any = None
+
+
+class MixpanelEvent(msgspec.Struct):
+    """One line of the Mixpanel raw export."""
+
+    event: Optional[str] = None
+    properties: MixpanelEventProperties = msgspec.field(default_factory=MixpanelEventProperties)
+
+
+EVENT_DECODER = msgspec.json.Decoder(MixpanelEvent)
+
+
+def load_hubspot_id_cache() -> Dict[str, Optional[str]]:
+    """Load cached organisation_id -> hubSpot company id pairs younger than the TTL."""
+    with closing(sqlite3.connect(HUBSPOT_ID_CACHE_FILE)) as db:
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS hubspot_ids "
+            "(organisation_id TEXT PRIMARY KEY, hubspot_company_id TEXT, cached_at INTEGER)"
+        )
+        rows = db.execute(
+            "SELECT organisation_id, hubspot_company_id FROM hubspot_ids "
+            "WHERE cached_at > CAST(strftime('%s', 'now', ?) AS INTEGER)",
+            (f"-{HUBSPOT_ID_CACHE_TTL_DAYS} days",),
+        )
+        return dict(rows.fetchall())
+
+
+def load_reported_org_ids() -> Set[str]:
+    """All organisation ids ever cached, regardless of age, so idle orgs keep being reset to zero."""
+    with closing(sqlite3.connect(HUBSPOT_ID_CACHE_FILE)) as db:
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS hubspot_ids "
+            "(organisation_id TEXT PRIMARY KEY, hubspot_company_id TEXT, cached_at INTEGER)"
+        )
+        return {row[0] for row in db.execute("SELECT organisation_id FROM hubspot_ids")}
+
+
+def save_hubspot_id_cache(hubspot_ids: Dict[str, str]) -> None:
+    """Persist newly resolved organisation_id -> hubSpot company id pairs."""
+    if not hubspot_ids:
+        return
+    with closing(sqlite3.connect(HUBSPOT_ID_CACHE_FILE)) as db, db:
+        db.executemany(
+            "INSERT OR REPLACE INTO hubspot_ids VALUES (?, ?, CAST(strftime('%s', 'now') AS INTEGER))",
+            hubspot_ids.items(),
+        )
+
+
+def main(hubspot: Optional[HubSpotConnector] = None) -> None:
+    hubspot = hubspot or hubcon
     event_names = list(MIXPANEL_EVENT_TO_HUBSPOT_PROPERTY)
-    org_ids = mixpanel.get_property_values("organization_id")
     
-    #initialize dict with all orgs to update by cozero id with all events to be tracked
-
-    aggregated: Dict[str, Dict[str, Dict[str, object]]] = {
-        event: {
-            org_id: {
-                "urls": [],
-                "count": 0,
-            }
-            for org_id in org_ids
-        }
-        for event in event_names
-    }
+    #event counts per org, and url keyword hits per org (only for events mapped by url keyword)
+
+    counts: DefaultDict[str, Counter] = defaultdict(Counter)
+    keyword_hits: DefaultDict[str, DefaultDict[str, Counter]] = defaultdict(lambda: defaultdict(Counter))
     
-    #initialize dict to filter out duplicates 
+    #initialize set to filter out duplicates; stores 64-bit hashes of (event, $insert_id)
+    #instead of the id strings, collisions are negligible at export sizes
 
-    seen_insert_ids: Dict[str, Set[str]] = {event: set() for event in event_names}
+    seen_insert_ids: Set[int] = set()
     
     #get event occurences and count them
 
-    event_stream = mixpanel.export_events(event_names, start_date=START_DATE, end_date=END_DATE)
+    export_lines = mixpanel.iter_export_lines_parallel(event_names, start_date=START_DATE, end_date=END_DATE)
 
-    for event in event_stream:
-        event_name = event.get("event")
-        if event_name not in aggregated:
+    for line in export_lines:
+        try:
+            event = EVENT_DECODER.decode(line)
+        except msgspec.DecodeError:
+            logger.debug("Skipping undecodable line from Mixpanel export.")
             continue
 
-        properties = event.get("properties") or {}
-        insert_id = properties.get("$insert_id")
+        event_name = event.event
+        if event_name not in MIXPANEL_EVENT_TO_HUBSPOT_PROPERTY:
+            continue
+
+        properties = event.properties
+        insert_id = properties.insert_id
         if insert_id:
-            if insert_id in seen_insert_ids[event_name]:
+            insert_key = hash((event_name, str(insert_id)))
+            if insert_key in seen_insert_ids:
                 continue
-            seen_insert_ids[event_name].add(insert_id)
+            seen_insert_ids.add(insert_key)
 
 
-        cozero_org_id = properties.get("organization_id")
+        cozero_org_id = properties.organization_id
         if cozero_org_id in (None, "", "UNKNOWN"):
             continue
 
         org_id_str = str(cozero_org_id)
-        
-        #add org if not already in the initialized dict (required to get all organizations)
-        entry = aggregated[event_name].setdefault(
-            org_id_str,
-            {
-                "urls": [],
-                "count": 0,
-            },
-        )
+        counts[event_name][org_id_str] += 1
 
-        
+        keywords = URL_KEYWORDS.get(event_name)
+        if keywords:
+            url = properties.url
+            if url and isinstance(url, str):
+                hits = keyword_hits[event_name][org_id_str]
+                for keyword, hubspot_property in keywords:
+                    if keyword in url:
+                        hits[hubspot_property] += 1
 
-        url = properties.get("url")
-        if url:
-            entry.setdefault("urls", []).append(url)
-            
-        entry["count"] = int(entry.get("count", 0)) + 1
 
+    #orgs are discovered from the event stream, plus every org reported by earlier runs
+    #so orgs without events in the window are still reset to zero
 
-    hubspot_cache: Dict[str, Optional[str]] = {}
+    seen_org_ids: Set[str] = set().union(*counts.values()) | load_reported_org_ids()
 
-    for event_name, mapping in MIXPANEL_EVENT_TO_HUBSPOT_PROPERTY.items():
-        entries = aggregated.get(event_name, {})
+    #hubspot ids cached by previous runs; only new orgs are searched
+
+    hubspot_cache: Dict[str, Optional[str]] = load_hubspot_id_cache()
+    new_hubspot_ids: Dict[str, str] = {}
+
+    #merge property updates per hubspot company so each company is sent once
+
+    company_updates: Dict[str, Dict[str, object]] = {}
+    company_org_ids: Dict[str, str] = {}
 
-        for org_id, entry in entries.items():
+    for event_name, mapping in MIXPANEL_EVENT_TO_HUBSPOT_PROPERTY.items():
+        #every org seen in the stream is reported, with a zero count when it had no such event
+        for org_id in seen_org_ids:
             #if event is not page-view
             if isinstance(mapping, str):
-                property_updates = {mapping: entry.get("count", 0)}
+                property_updates = {mapping: counts[event_name][org_id]}
             
-            #if event is page-view we need to only count urls with the corresponding keyword in the mapping
+            #if event is page-view we only report urls with the corresponding keyword in the mapping
             else:
-                urls = entry.get("urls", [])
+                hits = keyword_hits[event_name].get(org_id, {})
                 property_updates = {
-                    hubspot_property: sum(1 for url in urls if keyword in url)
-                    for keyword, hubspot_property in mapping.items()
+                    hubspot_property: hits.get(hubspot_property, 0)
+                    for hubspot_property in mapping.values()
                 }
                 
                 
@@ -118,7 +201,7 @@ def main() -> None:
                 hubspot_org_id = hubspot_cache[org_id]
             else:
                 try:
-                    resp = hubcon.search_company({"organisation_id": org_id}, {}, 1)
+                    resp = hubspot.search_company({"organisation_id": org_id}, {}, 1)
                 except Exception as exc:
                     print(f"HubSpot search failed for organisation_id {org_id}: {exc}")
                     hubspot_cache[org_id] = None
@@ -128,28 +211,40 @@ def main() -> None:
                 hubspot_org_id = results[0].get("id") if results else None
                 if not hubspot_org_id:
                     print(f"No HubSpot company found for organisation_id {org_id}")
+                else:
+                    new_hubspot_ids[org_id] = hubspot_org_id
                 hubspot_cache[org_id] = hubspot_org_id
 
             if not hubspot_org_id:
                 continue
 
-            try:
-                hubcon.update_company_properties(
-                    hubspot_org_id, property_updates
-                )
-                printable = ", ".join(
-                    f"{prop}={value}" for prop, value in property_updates.items()
-                )
-                print(f"Company cozero id:{org_id} updated: {printable}")
-            except Exception as exc:
-                print(f"Failed to update HubSpot company {hubspot_org_id}: {exc}")
-                continue
-    
-    companies_updated = sum(1 for company_id in hubspot_cache.values() if company_id)
-    print(f"{companies_updated} company profiles have been updated in HubSpot")
+            company_updates.setdefault(hubspot_org_id, {}).update(property_updates)
+            company_org_ids[hubspot_org_id] = org_id
+
+    save_hubspot_id_cache(new_hubspot_ids)
+
+    for hubspot_org_id, property_updates in company_updates.items():
+        printable = ", ".join(
+            f"{prop}={value}" for prop, value in property_updates.items()
+        )
+        print(f"Company cozero id:{company_org_ids[hubspot_org_id]} queued: {printable}")
+
+    try:
+        updated = hubspot.batch_update_companies(
+            [
+                {"id": hubspot_org_id, "properties": property_updates}
+                for hubspot_org_id, property_updates in company_updates.items()
+            ]
+        )
+    except Exception as exc:
+        print(f"Failed to batch update HubSpot companies: {exc}")
+        return
+
+    print(f"{len(updated)} company profiles have been updated in HubSpot")
 
 if __name__ == "__main__":
     try:
         main()
     finally:
         mixpanel.close()
+        hubcon.close()
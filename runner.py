@@ -0,0 +1,61 @@
+"""
+Runs the DB KPI, ARR and Mixpanel KPI syncs concurrently.
+
+The three pipelines are independent and I/O-bound, so each one runs in a worker
+thread under a single asyncio event loop. They share one HubSpotConnector, and
+with it the request rate limiters, so the combined run stays within HubSpot's budget.
+"""
+import asyncio
+import logging
+
+import DB_kpi
+import arr_sync
+import mixpanel_kpi
+from utilities.hubspot_api import HubSpotConnector
+
+# Logging setup
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+logger = logging.getLogger(__name__)
+
+SYNCS = {
+    "DB_kpi": DB_kpi.main,
+    "arr_sync": arr_sync.main,
+    "mixpanel_kpi": mixpanel_kpi.main,
+}
+
+
+async def run_all(hubspot: HubSpotConnector) -> bool:
+    """Run every sync concurrently; returns False if any of them raised."""
+    results = await asyncio.gather(
+        *(asyncio.to_thread(sync, hubspot) for sync in SYNCS.values()),
+        return_exceptions=True,
+    )
+
+    ok = True
+    for name, result in zip(SYNCS, results):
+        if isinstance(result, BaseException):
+            logger.error("%s sync failed: %s", name, result, exc_info=result)
+            ok = False
+        else:
+            logger.info("%s sync finished.", name)
+    return ok
+
+
+def main() -> None:
+    hubspot = HubSpotConnector()
+    try:
+        if not asyncio.run(run_all(hubspot)):
+            raise SystemExit(1)
+    finally:
+        hubspot.close()
+        DB_kpi.POOL.closeall()
+        mixpanel_kpi.mixpanel.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utilities import mixpanel_api
+from utilities.mixpanel_api import MixpanelConnector
+
+LINES = [b'{"event": "e%d", "properties": {"n": %d}}' % (n, n) for n in range(20)]
+BODY = b"\n".join(LINES) + b"\n"
+
+
+class ExportHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        mode = self.path.strip("/").split("?")[0]
+        body = gzip.compress(BODY) if mode == "gzip" else BODY
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        if mode == "gzip":
+            self.send_header("Content-Encoding", "gzip")
+        if mode == "chunked":
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(body), 100):
+                chunk = body[start : start + 100]
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ExportHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def connector():
+    mixpanel = MixpanelConnector(username="user", secret="secret", project_id="1")
+    yield mixpanel
+    mixpanel.close()
+
+
+@pytest.mark.parametrize("mode", ["plain", "gzip", "chunked"])
+def test_iter_export_lines_reads_to_eof(monkeypatch, server_url, connector, mode):
+    monkeypatch.setattr(mixpanel_api, "EXPORT_URL", f"{server_url}/{mode}")
+
+    lines = list(connector.iter_export_lines(["e"], start_date="2024-01-01", end_date="2024-01-02"))
+
+    assert lines == LINES
+
+
+def test_export_events_parallel_merges_all_shards(monkeypatch, server_url, connector):
+    monkeypatch.setattr(mixpanel_api, "EXPORT_URL", f"{server_url}/gzip")
+
+    events = list(
+        connector.export_events_parallel(
+            ["e"], start_date="2024-01-01", end_date="2024-01-04", workers=4
+        )
+    )
+
+    assert len(events) == 4 * len(LINES)
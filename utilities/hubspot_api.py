@@ -7,12 +7,29 @@ Handles authentication, retries, and consistent error messaging.
 """
 from __future__ import annotations
 
+import copy
+import json
 import os
+import random
 import time
 import logging
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+try:
+    import cachetools
+except ImportError:  # cachetools is optional; GET responses are simply not memoized
+    cachetools = None
 
 # --- Logging setup -----------------------------------------------------------
 logging.basicConfig(
@@ -22,6 +39,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)  
 
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _parse_json(resp: requests.Response) -> Any:
+    """Decode a response body straight from bytes (orjson when available)."""
+    return _json_loads(resp.content)
+
 # --- Environment setup ---------------------------------
 load_dotenv()
 
@@ -31,8 +55,26 @@ DEFAULT_HEADERS = {
     "Authorization": f"Bearer {ACCESS_TOKEN}",
     "Content-Type": "application/json",
 }
+T = TypeVar("T")
+R = TypeVar("R")
+
 DEFAULT_TIMEOUT = 30
+MAX_BACKOFF = 30.0
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
 DEFAULT_SEARCH_LIMIT = 100
+SEARCH_IN_FILTER_LIMIT = 100
+BATCH_INPUT_LIMIT = 100
+ASSOCIATION_BATCH_LIMIT = 1000
+MAX_CONCURRENT_BATCHES = 9
+GET_CACHE_SIZE = 10_000
+GET_CACHE_TTL = 60
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_OPEN_SECONDS = 30.0
+# Client-side request budget (requests per RATE_PERIOD seconds); search endpoints have a lower cap.
+RATE_LIMIT = 9
+SEARCH_RATE_LIMIT = 4
+RATE_PERIOD = 1.0
 DEFAULT_DEAL_PROPERTIES = [
     "dealname",
     "company_name",
@@ -69,12 +111,159 @@ DEFAULT_LINE_ITEM_PROPERTIES = [
 ]
 
 
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` acquisitions every `per` seconds."""
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    float(self.rate),
+                    self._tokens + (now - self._updated) * self.rate / self.per,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.per / self.rate
+            time.sleep(wait)
+
+    def observe(self, remaining: int, rate: Optional[int] = None, per: Optional[float] = None) -> None:
+        """
+        Align the bucket with server-reported rate limit state.
+
+        Args:
+            remaining: Requests the server still allows in its current window.
+            rate: Server-side request cap per window, if reported.
+            per: Server-side window length in seconds, if reported.
+        """
+        with self._lock:
+            if rate and per:
+                self.rate = rate
+                self.per = per
+            self._tokens = min(self._tokens, float(remaining))
+
+
 class HubSpotConnector:
     """Class to interact with HubSpot CRM API."""
 
-    def __init__(self, max_retries: int = 3, backoff_base: float = 1.5):
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_base: float = 1.5,
+        max_workers: int = MAX_CONCURRENT_BATCHES,
+        session: Optional[requests.Session] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
         self.max_retries = max_retries
         self.backoff_base = backoff_base
+        self.max_workers = max_workers
+        # Caps in-flight fan-out requests across all concurrent callers of this connector.
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self.limiter = RateLimiter(RATE_LIMIT, RATE_PERIOD)
+        self.search_limiter = RateLimiter(SEARCH_RATE_LIMIT, RATE_PERIOD)
+
+        # One pooled session keeps TCP/TLS connections alive across requests.
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                max_retries=0,
+            )
+            session.mount("https://", adapter)
+        self.session = session
+        # Resolved once; extra headers (or a different token) can be passed in without touching the env.
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.session.headers.update(self.headers)
+
+        # Short-lived memo of idempotent GETs (get_object, get_associations) within a run.
+        self._get_cache = (
+            cachetools.TTLCache(maxsize=GET_CACHE_SIZE, ttl=GET_CACHE_TTL)
+            if cachetools is not None
+            else None
+        )
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # Identical GETs issued concurrently share one HTTP call (see _request).
+        self._inflight: Dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+        # Circuit breaker: after repeated 5xx/429/network failures, fail fast for a while.
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._circuit_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close the underlying requests session."""
+        self.session.close()
+
+    def __enter__(self) -> "HubSpotConnector":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _map_concurrent(self, func: Callable[[T], R], items: Sequence[T]) -> List[R]:
+        """Apply func to every item concurrently (bounded by max_workers), keeping input order."""
+        def run(item: T) -> R:
+            with self._slots:
+                return func(item)
+
+        if len(items) <= 1:
+            return [run(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(run, items))
+
+    # --- GET cache ------------------------------------------------------------
+
+    def _cache_get(self, key: tuple) -> Optional[Any]:
+        """Return a copy of the cached value for key, or None on a miss."""
+        if self._get_cache is None:
+            return None
+        with self._cache_lock:
+            value = self._get_cache.get(key)
+            if value is None:
+                self._cache_misses += 1
+            else:
+                self._cache_hits += 1
+            hits, misses = self._cache_hits, self._cache_misses
+        logger.debug(
+            "GET cache %s for %s (hits=%d, misses=%d)",
+            "hit" if value is not None else "miss",
+            key,
+            hits,
+            misses,
+        )
+        return copy.deepcopy(value) if value is not None else None
+
+    def _cache_put(self, key: tuple, value: Any) -> None:
+        if self._get_cache is None:
+            return
+        with self._cache_lock:
+            self._get_cache[key] = copy.deepcopy(value)
+
+    def invalidate(self, object_type: str, object_id: Union[str, int]) -> None:
+        """Drop cached GET results (object reads and its associations) for one object."""
+        if self._get_cache is None:
+            return
+        object_id = str(object_id)
+        with self._cache_lock:
+            stale = [key for key in self._get_cache if key[1] == object_type and key[2] == object_id]
+            for key in stale:
+                self._get_cache.pop(key, None)
 
     # --- Contact methods ----------------------------------------------------
 
@@ -84,38 +273,80 @@ class HubSpotConnector:
         properties: Optional[Dict[str, Any]] = None,
         timeout: int = 15,
     ) -> Dict[str, Any]:
-        """Create or update a contact identified by email."""
-        if not email or "@" not in email:
-            raise ValueError(f"Invalid or missing email for HubSpot upsert: {email}")
+        """Create or update a contact identified by email; returns HubSpot's response body."""
+        return self._send_contact_upserts([(email, properties)], timeout=timeout)[0]
 
-        if properties is None:
-            properties = {}
-        elif not isinstance(properties, dict):
-            raise TypeError("properties must be a dict mapping HubSpot internal names to values.")
+    def upsert_hubspot_contacts(
+        self,
+        contacts: Iterable[Tuple[str, Optional[Dict[str, Any]]]],
+        timeout: int = 15,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Create or update many contacts identified by email, 100 inputs per request.
 
-        payload = {
-            "inputs": [
-                {
-                    "id": email.lower().strip(),
-                    "idProperty": "email",
-                    "properties": properties,
-                }
-            ]
-        }
+        Args:
+            contacts: (email, properties) pairs. Emails are normalised and
+                deduplicated; the last properties given for an email win.
+            timeout: Optional request timeout in seconds.
 
-        resp = self._request(
-            "POST",
-            "/crm/v3/objects/contacts/batch/upsert",
-            json_body=payload,
-            timeout=timeout,
-        )
-        try:
-            resp.raise_for_status()
-        except requests.HTTPError:
-            logger.error("HubSpot contact upsert failed: %s", resp.text)
-            raise
+        Returns:
+            {"results": [...], "errors": [...]} gathered from every batch response,
+            so per-record upsert failures stay visible to the caller.
+        """
+        results: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+        for data in self._send_contact_upserts(contacts, timeout=timeout):
+            results.extend(data.get("results", []))
+            errors.extend(data.get("errors", []))
+        logger.info("Upserted %d contacts (%d errors)", len(results), len(errors))
+        return {"results": results, "errors": errors}
+
+    def _send_contact_upserts(
+        self,
+        contacts: Iterable[Tuple[str, Optional[Dict[str, Any]]]],
+        timeout: int,
+    ) -> List[Dict[str, Any]]:
+        """Validate, deduplicate and post contact upserts; returns each chunk's parsed body."""
+        inputs: Dict[str, Dict[str, Any]] = {}
+        for email, properties in contacts:
+            if not email or "@" not in email:
+                raise ValueError(f"Invalid or missing email for HubSpot upsert: {email}")
+
+            if properties is None:
+                properties = {}
+            elif not isinstance(properties, dict):
+                raise TypeError("properties must be a dict mapping HubSpot internal names to values.")
+
+            contact_id = email.lower().strip()
+            inputs.pop(contact_id, None)
+            inputs[contact_id] = {
+                "id": contact_id,
+                "idProperty": "email",
+                "properties": properties,
+            }
+
+        pending = iter(inputs.values())
+        chunks = list(iter(lambda: list(islice(pending, BATCH_INPUT_LIMIT)), []))
+
+        def send(chunk: List[Dict[str, Any]]) -> Dict[str, Any]:
+            resp = self._request(
+                "POST",
+                "/crm/v3/objects/contacts/batch/upsert",
+                json_body={"inputs": chunk},
+                timeout=timeout,
+            )
+            try:
+                resp.raise_for_status()
+            except requests.HTTPError:
+                logger.error("HubSpot contact upsert failed: %s", resp.text)
+                raise
 
-        return resp.json()
+            data = _parse_json(resp)
+            for error in data.get("errors", []):
+                logger.error("Contact upsert error: %s", error.get("message"))
+            return data
+
+        return self._map_concurrent(send, chunks)
 
     # --- Generic object helpers -------------------------------------------
 
@@ -133,6 +364,7 @@ class HubSpotConnector:
         path = f"/crm/v3/objects/{object_type}/{object_id}"
         payload = {"properties": properties}
         resp = self._request("PATCH", path, json_body=payload, timeout=timeout)
+        self.invalidate(object_type, object_id)
 
         if resp.status_code == 200:
             logger.info(
@@ -141,7 +373,7 @@ class HubSpotConnector:
                 object_id,
                 list(properties.keys()),
             )
-            return resp.json()
+            return _parse_json(resp)
 
         logger.error(
             "Failed to update %s %s. Status: %s, Response: %s",
@@ -161,9 +393,15 @@ class HubSpotConnector:
         timeout: int = DEFAULT_TIMEOUT,
     ) -> Optional[Dict[str, Any]]:
         """Retrieve a single object and optionally limit the returned properties."""
+        properties = list(properties or ())
+        cache_key = ("object", object_type, str(object_id), tuple(sorted(properties)))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         params: Optional[Dict[str, Any]] = None
         if properties:
-            params = {"properties": list(properties)}
+            params = {"properties": properties}
 
         resp = self._request(
             "GET",
@@ -173,7 +411,9 @@ class HubSpotConnector:
         )
         if resp.status_code == 200:
             logger.info("Retrieved %s %s", object_type, object_id)
-            return resp.json()
+            record = _parse_json(resp)
+            self._cache_put(cache_key, record)
+            return record
 
         logger.error(
             "Failed to retrieve %s %s. Status: %s, Response: %s",
@@ -184,7 +424,137 @@ class HubSpotConnector:
         )
         return None
 
-    def search_objects(
+    def batch_read_objects(
+        self,
+        object_type: str,
+        object_ids: Iterable[Union[str, int]],
+        *,
+        properties: Optional[Iterable[str]] = None,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Retrieve many objects through the batch read endpoint, 100 IDs per request.
+
+        Args:
+            object_type: HubSpot object type (e.g., "line_items", "deals").
+            object_ids: Object identifiers; duplicates are read once.
+            properties: Properties to return.
+            timeout: Optional request timeout in seconds.
+
+        Returns:
+            Mapping of object ID to its record, or None if a batch request fails.
+        """
+        ids = list(dict.fromkeys(str(object_id) for object_id in object_ids))
+        props = list(properties) if properties else []
+
+        chunks = [
+            ids[start : start + BATCH_INPUT_LIMIT]
+            for start in range(0, len(ids), BATCH_INPUT_LIMIT)
+        ]
+
+        def read(chunk: List[str]) -> Optional[List[Dict[str, Any]]]:
+            payload = {
+                "properties": props,
+                "inputs": [{"id": object_id} for object_id in chunk],
+            }
+            resp = self._request(
+                "POST",
+                f"/crm/v3/objects/{object_type}/batch/read",
+                json_body=payload,
+                timeout=timeout,
+            )
+            if resp.status_code not in (200, 207):
+                logger.error(
+                    "Failed to batch read %d %s. Status: %s, Response: %s",
+                    len(chunk),
+                    object_type,
+                    resp.status_code,
+                    resp.text,
+                )
+                return None
+
+            data = _parse_json(resp)
+            for error in data.get("errors", []):
+                logger.error("%s batch read error: %s", object_type, error.get("message"))
+            return data.get("results", [])
+
+        records: Dict[str, Dict[str, Any]] = {}
+        for results in self._map_concurrent(read, chunks):
+            if results is None:
+                return None
+            for result in results:
+                records[str(result.get("id"))] = result
+
+        logger.info("Retrieved %d of %d %s", len(records), len(ids), object_type)
+        return records
+
+    def batch_update_objects(
+        self,
+        object_type: str,
+        updates: Sequence[Dict[str, Any]],
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> List[Dict[str, Any]]:
+        """
+        Update many objects through the batch endpoint, 100 inputs per request.
+
+        Batches are sent concurrently (see _map_concurrent).
+
+        Args:
+            object_type: HubSpot object type (e.g., "companies", "deals").
+            updates: Items shaped like {"id": ..., "properties": {...}}; items
+                without properties are skipped, and properties of repeated IDs are
+                merged (later values win) since HubSpot rejects duplicate IDs in a batch.
+            timeout: Optional request timeout in seconds.
+
+        Returns:
+            The updated records returned by HubSpot.
+        """
+        merged: Dict[str, Dict[str, Any]] = {}
+        for update in updates:
+            if update.get("properties"):
+                merged.setdefault(str(update["id"]), {}).update(update["properties"])
+        inputs = [
+            {"id": object_id, "properties": properties}
+            for object_id, properties in merged.items()
+        ]
+
+        chunks = [
+            inputs[start : start + BATCH_INPUT_LIMIT]
+            for start in range(0, len(inputs), BATCH_INPUT_LIMIT)
+        ]
+
+        def send(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            resp = self._request(
+                "POST",
+                f"/crm/v3/objects/{object_type}/batch/update",
+                json_body={"inputs": chunk},
+                timeout=timeout,
+            )
+            for item in chunk:
+                self.invalidate(object_type, item["id"])
+            if resp.status_code not in (200, 207):
+                logger.error(
+                    "Failed to batch update %d %s. Status: %s, Response: %s",
+                    len(chunk),
+                    object_type,
+                    resp.status_code,
+                    resp.text,
+                )
+                return []
+
+            data = _parse_json(resp)
+            results = data.get("results", [])
+            logger.info("Batch updated %d of %d %s", len(results), len(chunk), object_type)
+            for error in data.get("errors", []):
+                logger.error("%s batch update error: %s", object_type, error.get("message"))
+            return results
+
+        updated: List[Dict[str, Any]] = []
+        for results in self._map_concurrent(send, chunks):
+            updated.extend(results)
+        return updated
+
+    def iter_search_objects(
         self,
         object_type: str,
         filter_groups: Sequence[Dict[str, Any]],
@@ -192,27 +562,26 @@ class HubSpotConnector:
         properties: Optional[Iterable[str]] = None,
         limit: int = DEFAULT_SEARCH_LIMIT,
         timeout: int = DEFAULT_TIMEOUT,
-    ) -> Dict[str, Any]:
-        """Run a paginated search against a HubSpot object type."""
+    ) -> Iterator[Dict[str, Any]]:
+        """Run a paginated search against a HubSpot object type, yielding results page by page."""
         if not filter_groups:
             raise ValueError("At least one filter group is required.")
 
-        all_results: List[Dict[str, Any]] = []
-        after: Optional[str] = None
+        # Built once; only the paging cursor changes between pages. Materialising the
+        # properties also keeps a one-shot iterable from being spent after page one.
+        path = f"/crm/v3/objects/{object_type}/search"
+        payload: Dict[str, Any] = {
+            "filterGroups": list(filter_groups),
+            "limit": limit,
+        }
+        if properties:
+            payload["properties"] = list(properties)
+        total = 0
 
         while True:
-            payload: Dict[str, Any] = {
-                "filterGroups": list(filter_groups),
-                "limit": limit,
-            }
-            if properties:
-                payload["properties"] = list(properties)
-            if after:
-                payload["after"] = after
-
             resp = self._request(
                 "POST",
-                f"/crm/v3/objects/{object_type}/search",
+                path,
                 json_body=payload,
                 timeout=timeout,
             )
@@ -225,24 +594,69 @@ class HubSpotConnector:
                 )
                 break
 
-            data = resp.json()
+            data = _parse_json(resp)
             results = data.get("results", [])
-            all_results.extend(results)
+            total += len(results)
             logger.info(
                 "Retrieved %d %s (total so far: %d)",
                 len(results),
                 object_type,
-                len(all_results),
+                total,
             )
+            yield from results
 
             after = data.get("paging", {}).get("next", {}).get("after")
             if not after:
                 break
+            payload["after"] = after
 
-        return {"results": all_results}
+    def search_objects(
+        self,
+        object_type: str,
+        filter_groups: Sequence[Dict[str, Any]],
+        *,
+        properties: Optional[Iterable[str]] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> Dict[str, Any]:
+        """Run a paginated search against a HubSpot object type."""
+        results = self.iter_search_objects(
+            object_type,
+            filter_groups,
+            properties=properties,
+            limit=limit,
+            timeout=timeout,
+        )
+        return {"results": list(results)}
 
     # --- Internal Request Handler ------------------------------------------
 
+    def _throttle(self, path: str) -> None:
+        """Wait for the client-side rate limit budget before sending a request."""
+        if "/search" in path:
+            self.search_limiter.acquire()
+        self.limiter.acquire()
+
+    def _observe_rate_limit(self, resp: requests.Response) -> None:
+        """Retune the general bucket from HubSpot's X-HubSpot-RateLimit-* headers."""
+        remaining = resp.headers.get("X-HubSpot-RateLimit-Remaining")
+        if remaining is None:
+            return
+        try:
+            limit_max = resp.headers.get("X-HubSpot-RateLimit-Max")
+            interval_ms = resp.headers.get("X-HubSpot-RateLimit-Interval-Milliseconds")
+            self.limiter.observe(
+                int(remaining),
+                rate=int(limit_max) if limit_max else None,
+                per=int(interval_ms) / 1000 if interval_ms else None,
+            )
+        except ValueError:
+            logger.debug("Ignoring malformed HubSpot rate limit headers.")
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff capped at MAX_BACKOFF, with equal jitter so retries spread out."""
+        return min(MAX_BACKOFF, self.backoff_base ** attempt) * (0.5 + random.random() * 0.5)
+
     def _request(
         self,
         method: str,
@@ -252,37 +666,129 @@ class HubSpotConnector:
         json_body: Optional[Dict[str, Any]] = None,
         timeout: int = DEFAULT_TIMEOUT,
     ) -> requests.Response:
-        url = f"{BASE_URL}{path}"
+        method = method.upper()
+        if method != "GET":
+            return self._send(method, path, params=params, json_body=json_body, timeout=timeout)
+
+        # Coalesce concurrent identical GETs: the first caller sends, the rest wait on its Future.
+        key = (
+            path,
+            tuple(
+                sorted(
+                    (name, tuple(value) if isinstance(value, list) else value)
+                    for name, value in (params or {}).items()
+                )
+            ),
+        )
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._inflight[key] = Future()
+
+        if not owner:
+            return pending.result()
+
+        try:
+            resp = self._send(method, path, params=params, timeout=timeout)
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        else:
+            pending.set_result(resp)
+            return resp
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _admit(self) -> bool:
+        """
+        Gate a request on the circuit breaker; returns True when it is the half-open trial.
+
+        While the circuit is open every caller fails fast. Once the window lapses, exactly
+        one caller is let through as a trial: the window is pushed forward while it is in
+        flight, so concurrent callers keep failing fast until the trial settles the state.
+        """
+        with self._circuit_lock:
+            now = time.monotonic()
+            if now < self._open_until:
+                raise RuntimeError("HubSpot request failed: circuit open")
+            if self._consecutive_failures < CIRCUIT_FAILURE_THRESHOLD:
+                return False
+            self._open_until = now + CIRCUIT_OPEN_SECONDS
+            return True
+
+    def _record_outcome(self, failed: bool) -> None:
+        """Track consecutive upstream failures; open the circuit once the threshold is hit."""
+        with self._circuit_lock:
+            if not failed:
+                self._consecutive_failures = 0
+                self._open_until = 0.0
+                return
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+                self._open_until = time.monotonic() + CIRCUIT_OPEN_SECONDS
+                logger.error(
+                    "HubSpot circuit open for %.0fs after %d consecutive failures",
+                    CIRCUIT_OPEN_SECONDS,
+                    self._consecutive_failures,
+                )
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> requests.Response:
+        trial = self._admit()
+        url = BASE_URL + path
         last_exc: Optional[Exception] = None
 
         for attempt in range(self.max_retries + 1):
+            self._throttle(path)
             try:
-                resp = requests.request(
-                    method.upper(),
+                resp = self.session.request(
+                    method,
                     url,
-                    headers=DEFAULT_HEADERS,
                     params=params,
                     json=json_body,
                     timeout=timeout,
                 )
+                self._observe_rate_limit(resp)
 
                 if resp.status_code == 429 and attempt < self.max_retries:
                     retry_after = resp.headers.get("Retry-After")
-                    delay = float(retry_after) if retry_after else (self.backoff_base ** attempt)
+                    delay = float(retry_after) if retry_after else self._backoff_delay(attempt)
                     logger.warning("Rate limited (429). Retrying in %.1fs...", delay)
                     time.sleep(delay)
                     continue
 
+                if resp.status_code >= 500 and attempt < self.max_retries:
+                    delay = self._backoff_delay(attempt)
+                    logger.warning("Server error (%s). Retrying in %.1fs...", resp.status_code, delay)
+                    time.sleep(delay)
+                    continue
+
+                if resp.status_code == 429 or resp.status_code >= 500:
+                    self._record_outcome(failed=True)
+                elif resp.ok or trial:
+                    # Any non-failure answer to the trial shows HubSpot is back; close the circuit.
+                    self._record_outcome(failed=False)
+                # Other 4xx responses are permanent; hand them straight back to the caller.
                 return resp
             except requests.RequestException as exc:
                 last_exc = exc
                 if attempt < self.max_retries:
-                    delay = self.backoff_base ** attempt
+                    delay = self._backoff_delay(attempt)
                     logger.warning("Request error: %s. Retrying in %.1fs...", exc, delay)
                     time.sleep(delay)
                     continue
                 break
 
+        self._record_outcome(failed=True)
         raise RuntimeError(f"HubSpot request failed: {last_exc}")
 
     # --- Company methods ------------------------------------------------------
@@ -308,6 +814,53 @@ class HubSpotConnector:
                 limit=limit,
             )
 
+    def bulk_search_companies(
+        self,
+        org_ids: Iterable[Union[str, int]],
+        properties: Optional[List[str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up companies for many organisation IDs with batched IN searches.
+
+        Args:
+            org_ids: Organisation IDs to resolve; duplicates and blanks are ignored.
+            properties: Company properties to return (defaults to organisation_id and name).
+
+        Returns:
+            Mapping of organisation_id to the first matching company record.
+        """
+        ids = list(dict.fromkeys(str(org_id) for org_id in org_ids if org_id not in (None, "")))
+        if properties is None:
+            properties = ["organisation_id", "name"]
+
+        companies: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(ids), SEARCH_IN_FILTER_LIMIT):
+            chunk = ids[start : start + SEARCH_IN_FILTER_LIMIT]
+            filter_groups = [
+                {
+                    "filters": [
+                        {
+                            "propertyName": "organisation_id",
+                            "operator": "IN",
+                            "values": chunk,
+                        }
+                    ]
+                }
+            ]
+            results = self.iter_search_objects(
+                "companies",
+                filter_groups,
+                properties=properties,
+                limit=DEFAULT_SEARCH_LIMIT,
+            )
+            for company in results:
+                org_id = company.get("properties", {}).get("organisation_id")
+                if org_id:
+                    companies.setdefault(str(org_id), company)
+
+        logger.info("Matched %d of %d organisation IDs to companies", len(companies), len(ids))
+        return companies
+
     def update_company_properties(
         self,
         company_id: Union[str, int],
@@ -316,6 +869,13 @@ class HubSpotConnector:
     ) -> Optional[Dict[str, Any]]:
         return self.update_object("companies", company_id, properties, timeout=timeout)
 
+    def batch_update_companies(
+        self,
+        updates: Sequence[Dict[str, Any]],
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> List[Dict[str, Any]]:
+        return self.batch_update_objects("companies", updates, timeout=timeout)
+
     # --- Deal methods ---------------------------------------------------------
 
     def search_deals_stage_id(self, stage_ids: Iterable[str]) -> Dict[str, Any]:
@@ -353,6 +913,11 @@ class HubSpotConnector:
             to_object_type: Target object type to fetch associations for.
             timeout: Optional request timeout in seconds.
         """
+        cache_key = ("associations", from_object_type, str(object_id), to_object_type)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         path = f"/crm/v3/objects/{from_object_type}/{object_id}/associations/{to_object_type}"
         resp = self._request("GET", path, timeout=timeout)
         if resp.status_code == 200:
@@ -362,7 +927,9 @@ class HubSpotConnector:
                 object_id,
                 to_object_type,
             )
-            return resp.json()
+            associations = _parse_json(resp)
+            self._cache_put(cache_key, associations)
+            return associations
 
         logger.error(
             "Failed to retrieve associations %s %s -> %s. Status: %s, Response: %s",
@@ -374,6 +941,67 @@ class HubSpotConnector:
         )
         return None
 
+    def batch_get_associations(
+        self,
+        from_object_type: str,
+        object_ids: Iterable[Union[str, int]],
+        to_object_type: str,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> Optional[Dict[str, List[str]]]:
+        """
+        Retrieve associations for many source objects via the v4 batch read endpoint.
+
+        Args:
+            from_object_type: Source object type (e.g., "deals").
+            object_ids: Identifiers of the source objects, up to 1000 per request.
+            to_object_type: Target object type to fetch associations for.
+            timeout: Optional request timeout in seconds.
+
+        Returns:
+            Mapping of source ID to associated target IDs (empty when none exist),
+            or None if a batch request fails.
+        """
+        ids = list(dict.fromkeys(str(object_id) for object_id in object_ids))
+        path = f"/crm/v4/associations/{from_object_type}/{to_object_type}/batch/read"
+
+        chunks = [
+            ids[start : start + ASSOCIATION_BATCH_LIMIT]
+            for start in range(0, len(ids), ASSOCIATION_BATCH_LIMIT)
+        ]
+
+        def read(chunk: List[str]) -> Optional[List[Dict[str, Any]]]:
+            payload = {"inputs": [{"id": object_id} for object_id in chunk]}
+            resp = self._request("POST", path, json_body=payload, timeout=timeout)
+            # 207 is returned when some source objects have no associations.
+            if resp.status_code not in (200, 207):
+                logger.error(
+                    "Failed to batch read associations %s -> %s. Status: %s, Response: %s",
+                    from_object_type,
+                    to_object_type,
+                    resp.status_code,
+                    resp.text,
+                )
+                return None
+            return _parse_json(resp).get("results", [])
+
+        associations: Dict[str, List[str]] = {object_id: [] for object_id in ids}
+        for results in self._map_concurrent(read, chunks):
+            if results is None:
+                return None
+            for result in results:
+                from_id = str(result.get("from", {}).get("id"))
+                associations.setdefault(from_id, []).extend(
+                    str(target["toObjectId"]) for target in result.get("to", []) if target.get("toObjectId")
+                )
+
+        logger.info(
+            "Associations retrieved: %d %s -> %s",
+            len(associations),
+            from_object_type,
+            to_object_type,
+        )
+        return associations
+
     # --- Line item methods ----------------------------------------------------
 
     def search_line_items(
@@ -401,15 +1029,56 @@ class HubSpotConnector:
             limit=DEFAULT_SEARCH_LIMIT,
         )
 
+    def batch_read_line_items(
+        self,
+        line_item_ids: Iterable[Union[str, int]],
+        properties: Optional[Iterable[str]] = None,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Retrieve many line items through the batch read endpoint, 100 IDs per request.
+
+        Args:
+            line_item_ids: Line item identifiers; duplicates are read once.
+            properties: Properties to return (defaults to DEFAULT_LINE_ITEM_PROPERTIES).
+            timeout: Optional request timeout in seconds.
+
+        Returns:
+            Mapping of line item ID to its properties, or None if a batch request fails.
+        """
+        if properties is None:
+            properties = DEFAULT_LINE_ITEM_PROPERTIES
+        line_items = self.batch_read_objects(
+            "line_items",
+            line_item_ids,
+            properties=properties,
+            timeout=timeout,
+        )
+        if line_items is None:
+            return None
+        return {line_item_id: record.get("properties", {}) for line_item_id, record in line_items.items()}
+
     def get_line_item_by_id(
         self,
-        line_item_id: Union[str, int],
+        line_item_id: Union[str, int, Iterable[Union[str, int]]],
         *,
         properties: Optional[Iterable[str]] = None,
         timeout: int = DEFAULT_TIMEOUT,
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[Union[Dict[str, Any], Dict[str, Dict[str, Any]]]]:
+        """
+        Retrieve a line item, or several when given a list of IDs.
+
+        A list of IDs is read through batch_read_line_items and returns the same
+        mapping of line item ID to properties instead of a single record.
+        """
         if properties is None:
             properties = DEFAULT_LINE_ITEM_PROPERTIES
+        if not isinstance(line_item_id, (str, int)):
+            return self.batch_read_line_items(
+                line_item_id,
+                properties=properties,
+                timeout=timeout,
+            )
         return self.get_object(
             "line_items",
             line_item_id,
@@ -418,4 +1087,5 @@ class HubSpotConnector:
         )
 
 
+
   
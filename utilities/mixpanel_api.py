@@ -6,14 +6,31 @@ shared auth, retry, and logging behaviour.
 """
 from __future__ import annotations
 
+import io
 import json
 import logging
 import os
+import queue
+import random
+import threading
 import time
-from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijson is optional; property values are then parsed in one go
+    ijson = None
 
 # --- Logging setup -----------------------------------------------------------
 logging.basicConfig(
@@ -23,6 +40,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_dumps(value: object) -> str:
+    """Serialise to a JSON string (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value)
+
 # --- Environment setup -------------------------------------------------------
 load_dotenv()
 
@@ -31,7 +57,39 @@ SECRET = os.getenv("MIXPANEL_SERVICE_SECRET", "").strip()
 PROJECT_ID = os.getenv("MIXPANEL_PROJECT_ID", "").strip()
 
 EXPORT_URL = "https://data-eu.mixpanel.com/api/2.0/export/"
+EXPORT_BUFFER_SIZE = 1 << 20
+EXPORT_WORKERS = 4
+EXPORT_QUEUE_SIZE = 10000
+MAX_BACKOFF = 30.0
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
 PROPERTY_URL = "https://eu.mixpanel.com/api/2.0/events/properties/values"
+MISSING_VALUES = frozenset((None, "", "UNKNOWN"))
+
+
+def _split_date_range(start_date: str, end_date: str, shards: int) -> List[Tuple[str, str]]:
+    """
+    Split an inclusive YYYY-MM-DD date range into at most `shards` contiguous sub-ranges.
+
+    Example: _split_date_range("2024-01-01", "2024-01-10", 3)
+        -> [("2024-01-01", "2024-01-04"), ("2024-01-05", "2024-01-07"), ("2024-01-08", "2024-01-10")]
+    """
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    total_days = (end - start).days + 1
+    if total_days < 1:
+        raise ValueError("end_date must not be before start_date.")
+
+    shards = max(1, min(shards, total_days))
+    base, extra = divmod(total_days, shards)
+
+    ranges: List[Tuple[str, str]] = []
+    shard_start = start
+    for index in range(shards):
+        shard_end = shard_start + timedelta(days=base + (1 if index < extra else 0) - 1)
+        ranges.append((shard_start.isoformat(), shard_end.isoformat()))
+        shard_start = shard_end + timedelta(days=1)
+    return ranges
 
 
 class MixpanelConnector:
@@ -56,11 +114,26 @@ class MixpanelConnector:
         self.max_retries = max_retries
         self.backoff_base = backoff_base
 
-        self.session = session or requests.Session()
+        # Size the pool for the parallel export shards; a caller-supplied session is used as-is.
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                max_retries=0,
+            )
+            session.mount("https://", adapter)
+        self.session = session
         self.session.auth = (self.username, self.secret)
+        # Serialised `event` export params, keyed on the sorted event names.
+        self._event_param_cache: Dict[Tuple[str, ...], str] = {}
 
     # --- Internal request helper -------------------------------------------
 
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff capped at MAX_BACKOFF, with equal jitter so retries spread out."""
+        return min(MAX_BACKOFF, self.backoff_base ** attempt) * (0.5 + random.random() * 0.5)
+
     def _request(
         self,
         method: str,
@@ -70,12 +143,13 @@ class MixpanelConnector:
         timeout: int = 60,
         stream: bool = False,
     ) -> requests.Response:
+        method = method.upper()
         last_exc: Optional[Exception] = None
 
         for attempt in range(self.max_retries + 1):
             try:
                 resp = self.session.request(
-                    method.upper(),
+                    method,
                     url,
                     params=params,
                     timeout=timeout,
@@ -86,16 +160,21 @@ class MixpanelConnector:
             except requests.HTTPError as exc:
                 if resp.status_code == 429 and attempt < self.max_retries:
                     retry_after = resp.headers.get("Retry-After")
-                    delay = float(retry_after) if retry_after else (self.backoff_base ** attempt)
+                    delay = float(retry_after) if retry_after else self._backoff_delay(attempt)
                     logger.warning("Mixpanel rate limited. Retrying in %.1fs...", delay)
                     time.sleep(delay)
                     continue
+                if resp.status_code >= 500 and attempt < self.max_retries:
+                    delay = self._backoff_delay(attempt)
+                    logger.warning("Mixpanel server error (%s). Retrying in %.1fs...", resp.status_code, delay)
+                    time.sleep(delay)
+                    continue
                 logger.error("Mixpanel request failed: %s", resp.text)
                 raise
             except requests.RequestException as exc:
                 last_exc = exc
                 if attempt < self.max_retries:
-                    delay = self.backoff_base ** attempt
+                    delay = self._backoff_delay(attempt)
                     logger.warning("Mixpanel request error: %s. Retrying in %.1fs...", exc, delay)
                     time.sleep(delay)
                     continue
@@ -103,6 +182,13 @@ class MixpanelConnector:
 
         raise RuntimeError(f"Mixpanel request failed: {last_exc}")
 
+    def _event_param(self, event_list: List[str]) -> str:
+        key = tuple(sorted(event_list))
+        param = self._event_param_cache.get(key)
+        if param is None:
+            param = self._event_param_cache[key] = _json_dumps(list(key))
+        return param
+
     # --- Public API ---------------------------------------------------------
 
     def get_property_values(
@@ -118,26 +204,34 @@ class MixpanelConnector:
             "name": property_name,
             "limit": limit,
         }
-        resp = self._request("GET", PROPERTY_URL, params=params, timeout=timeout)
+        resp = self._request("GET", PROPERTY_URL, params=params, timeout=timeout, stream=True)
 
-        values = resp.json()
-        cleaned = [
-            str(value)
-            for value in values
-            if value not in (None, "", "UNKNOWN")
-        ]
+        try:
+            if ijson is not None:
+                # Walk the JSON array item by item instead of materialising it first.
+                resp.raw.decode_content = True
+                values = ijson.items(resp.raw, "item")
+            else:
+                values = _json_loads(resp.content)
+            cleaned = [
+                str(value)
+                for value in values
+                if value not in MISSING_VALUES
+            ]
+        finally:
+            resp.close()
         logger.info("Retrieved %d values for property %s", len(cleaned), property_name)
         return cleaned
 
-    def export_events(
+    def iter_export_lines(
         self,
         event_names: Iterable[str],
         *,
         start_date: str,
         end_date: str,
         timeout: int = 120,
-    ) -> Iterator[Dict]:
-        """Stream events for the given names within a date range."""
+    ) -> Iterator[bytes]:
+        """Stream raw NDJSON lines for the given event names within a date range."""
         event_list = list(event_names)
         if not event_list:
             raise ValueError("event_names must contain at least one event.")
@@ -145,17 +239,135 @@ class MixpanelConnector:
         params = [
             ("from_date", start_date),
             ("to_date", end_date),
-            ("event", json.dumps(event_list)),
+            ("event", self._event_param(event_list)),
             ("project_id", self.project_id),
         ]
 
         resp = self._request("GET", EXPORT_URL, params=params, timeout=timeout, stream=True)
 
-        for line in resp.iter_lines():
-            if not line:
-                continue
+        # Read lines straight off the urllib3 stream; gzip is still undone by urllib3.
+        # auto_close would close the stream at end of body, and BufferedReader then
+        # raises on its next readline() instead of reporting EOF.
+        resp.raw.decode_content = True
+        resp.raw.auto_close = False
+        try:
+            for line in io.BufferedReader(resp.raw, buffer_size=EXPORT_BUFFER_SIZE):
+                line = line.rstrip(b"\r\n")
+                if line:
+                    yield line
+        finally:
+            resp.close()
+
+    def iter_export_lines_parallel(
+        self,
+        event_names: Iterable[str],
+        *,
+        start_date: str,
+        end_date: str,
+        workers: int = EXPORT_WORKERS,
+        timeout: int = 120,
+    ) -> Iterator[bytes]:
+        """
+        Stream raw NDJSON lines, exporting date-range shards concurrently.
+
+        The range is split into at most `workers` contiguous shards (not one request
+        per day, which would quickly exhaust Mixpanel's hourly export quota). Each
+        shard streams in its own thread into a bounded queue; lines are yielded in
+        arrival order, so ordering across shards is not preserved.
+        """
+        event_list = list(event_names)
+        if not event_list:
+            raise ValueError("event_names must contain at least one event.")
+
+        shards = _split_date_range(start_date, end_date, workers)
+        lines: queue.Queue = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        stop = threading.Event()
+        done = object()
+
+        def put(item: object) -> bool:
+            while not stop.is_set():
+                try:
+                    lines.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(shard_start: str, shard_end: str) -> None:
+            try:
+                shard_lines = self.iter_export_lines(
+                    event_list,
+                    start_date=shard_start,
+                    end_date=shard_end,
+                    timeout=timeout,
+                )
+                for line in shard_lines:
+                    if not put(line):
+                        shard_lines.close()
+                        return
+            except Exception as exc:
+                put(exc)
+            finally:
+                put(done)
+
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            for shard_start, shard_end in shards:
+                executor.submit(produce, shard_start, shard_end)
+
+            pending = len(shards)
+            try:
+                while pending:
+                    item = lines.get()
+                    if item is done:
+                        pending -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                stop.set()
+
+    def export_events(
+        self,
+        event_names: Iterable[str],
+        *,
+        start_date: str,
+        end_date: str,
+        timeout: int = 120,
+    ) -> Iterator[Dict]:
+        """Stream events for the given names within a date range."""
+        lines = self.iter_export_lines(
+            event_names,
+            start_date=start_date,
+            end_date=end_date,
+            timeout=timeout,
+        )
+        return self._decode_lines(lines)
+
+    def export_events_parallel(
+        self,
+        event_names: Iterable[str],
+        *,
+        start_date: str,
+        end_date: str,
+        workers: int = EXPORT_WORKERS,
+        timeout: int = 120,
+    ) -> Iterator[Dict]:
+        """Stream events like export_events, exporting date-range shards concurrently."""
+        lines = self.iter_export_lines_parallel(
+            event_names,
+            start_date=start_date,
+            end_date=end_date,
+            workers=workers,
+            timeout=timeout,
+        )
+        return self._decode_lines(lines)
+
+    @staticmethod
+    def _decode_lines(lines: Iterable[bytes]) -> Iterator[Dict]:
+        for line in lines:
             try:
-                yield json.loads(line.decode("utf-8"))
+                yield _json_loads(line)
             except json.JSONDecodeError:
                 logger.debug("Skipping invalid JSON line from Mixpanel export.")
                 continue